@@ -20,5 +20,20 @@ add_adk_fastapi_endpoint(app, adk_agent_sample, path="/")
 
 # If you want the server to run on invocation, you can do the following:
 if __name__ == "__main__":
+    import os
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+
+    # 会话保存在进程内存中，默认单worker；多worker部署时通过WEB_CONCURRENCY指定数量
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        # 多worker时必须以导入字符串的形式传入app
+        app if workers == 1 else "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop" if sys.platform != "win32" else "auto",
+        http="httptools",
+        workers=workers,
+        limit_concurrency=1000,
+        timeout_keep_alive=30,
+    )
@@ -1,30 +1,25 @@
 from veadk import Agent, Runner
-from veadk.memory.short_term_memory import ShortTermMemory
-
-from google.adk.artifacts import InMemoryArtifactService
 
 from xload_agent.prompts import apply_prompt_template
 from xload_agent.agents.terminal_agent import terminal_agent
 from xload_agent.agents.k6_agent import k6_agent
+from xload_agent.agents._shared import artifact_service, short_term_memory
 
-from xload_agent.tools import fs_tool_mcp
+from xload_agent.tools import get_fs_tool_mcp
 
-from xload_agent.config import Config
+from xload_agent.config import get_config
 
-config = Config()
+config = get_config()
 
 app_name = "xload_agent_app"
 user_id = "xload_agent_user"
 session_id = "xload_agent_session"
 
-artifact_service = InMemoryArtifactService()
-short_term_memory = ShortTermMemory()
-
 root_agent = Agent( 
     name="xload_agent",
     description=("An agent that can help you create and run k6 scripts"),
     instruction=apply_prompt_template("root_agent", PROJECT_ROOT=config.workspace_path),
-    tools=[fs_tool_mcp],
+    tools=[get_fs_tool_mcp()],
     sub_agents=[terminal_agent, k6_agent],
     artifact_service=artifact_service,
     memory_service=short_term_memory
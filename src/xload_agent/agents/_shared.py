@@ -0,0 +1,8 @@
+from google.adk.artifacts import InMemoryArtifactService
+from veadk.memory.short_term_memory import ShortTermMemory
+
+# 所有agent共用同一组制品服务和短期记忆，避免每个agent各自创建一份
+artifact_service = InMemoryArtifactService()
+short_term_memory = ShortTermMemory()
+
+__all__ = ["artifact_service", "short_term_memory"]
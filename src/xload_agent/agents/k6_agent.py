@@ -1,11 +1,10 @@
 from veadk import Agent
-from google.adk.artifacts import InMemoryArtifactService
-from veadk.memory.short_term_memory import ShortTermMemory
 from xload_agent.tools.k6.run import k6_tool
 from xload_agent.prompts import apply_prompt_template
-from xload_agent.config import Config
+from xload_agent.config import get_config
+from xload_agent.agents._shared import artifact_service, short_term_memory
 
-config = Config()
+config = get_config()
 WORKSPACE_PATH = config.workspace_path
 
 # 创建k6脚本执行agent
@@ -14,8 +13,8 @@ k6_agent = Agent(
     description="一个专门处理k6脚本执行的代理，提供k6脚本运行和负载测试功能",
     instruction=apply_prompt_template("k6_agent", PROJECT_ROOT=WORKSPACE_PATH),
     tools=[k6_tool],
-    artifact_service=InMemoryArtifactService(),
-    memory_service=ShortTermMemory()
+    artifact_service=artifact_service,
+    memory_service=short_term_memory
 )
 
 __all__ = ["k6_agent"]
\ No newline at end of file
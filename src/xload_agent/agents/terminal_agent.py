@@ -1,11 +1,10 @@
 from veadk import Agent
-from google.adk.artifacts import InMemoryArtifactService
-from veadk.memory.short_term_memory import ShortTermMemory
 from xload_agent.tools.terminal.bash import bash_tool
 from xload_agent.prompts import apply_prompt_template
-from xload_agent.config import Config
+from xload_agent.config import get_config
+from xload_agent.agents._shared import artifact_service, short_term_memory
 
-config = Config()
+config = get_config()
 WORKSPACE_PATH = config.workspace_path
 
 
@@ -15,8 +14,8 @@ terminal_agent = Agent(
     description="一个专门处理终端命令执行的代理，提供bash命令运行功能",
     instruction=apply_prompt_template("terminal_agent", PROJECT_ROOT=WORKSPACE_PATH),
     tools=[bash_tool],
-    artifact_service=InMemoryArtifactService(),
-    memory_service=ShortTermMemory()
+    artifact_service=artifact_service,
+    memory_service=short_term_memory
 )
 
 __all__ = ["terminal_agent"]
\ No newline at end of file
@@ -1,3 +1,3 @@
-from .config import Config, XLOAD_WORKSPACE, init_config
+from .config import Config, XLOAD_WORKSPACE, get_config, init_config
 
-__all__ = ["Config", "XLOAD_WORKSPACE", "init_config"]
+__all__ = ["Config", "XLOAD_WORKSPACE", "get_config", "init_config"]
@@ -1,44 +1,106 @@
+import os
+import json
+import functools
+import tempfile
+
 import yaml
 from pathlib import Path
+from typing import Optional
+
+# 优先使用libyaml提供的C实现加载器
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 # 获取项目根目录
 ROOT_DIR = Path(__file__).parent.parent.parent.parent.absolute()
 
 
+def _flatten(data: dict, prefix: str = ''):
+    """将嵌套配置展开为点号分隔的键，中间层级的字典同样保留"""
+    for key, value in data.items():
+        key_path = f"{prefix}{key}"
+        yield key_path, value
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{key_path}.")
+
+
 class Config:
     """配置管理类，从config.yaml读取配置"""
     
-    def __init__(self):
-        self.config_path = ROOT_DIR / 'config.yaml'
+    def __init__(self, config_path: Optional[Path] = None):
+        self.config_path = Path(config_path) if config_path else ROOT_DIR / 'config.yaml'
         self._config_data = self._load_config()
+        # 预先展开为点号路径到值的映射，get只需一次字典查找
+        self._flat = dict(_flatten(self._config_data)) if isinstance(self._config_data, dict) else {}
     
     def _load_config(self):
-        """加载配置文件"""
+        """加载配置文件，解析结果以JSON缓存在config.yaml.json中
+
+        缓存同时记录配置文件的修改时间（纳秒）和大小，两者与当前配置文件完全一致时才使用缓存。
+        文件状态在读取配置之前获取，读取期间或之后发生的修改都会使缓存失效。
+        """
+        cache_path = self.config_path.with_suffix('.yaml.json')
+        try:
+            config_stat = self.config_path.stat()
+        except FileNotFoundError:
+            print(f"Warning: config.yaml not found at {self.config_path}")
+            return {}
+        
+        # 缓存对应的正是当前的配置文件时直接读取缓存
+        try:
+            cache = json.loads(cache_path.read_bytes())
+            if cache['mtime_ns'] == config_stat.st_mtime_ns and cache['size'] == config_stat.st_size:
+                return cache['data']
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+        
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+                config_data = yaml.load(f, Loader=SafeLoader)
         except FileNotFoundError:
             print(f"Warning: config.yaml not found at {self.config_path}")
             return {}
         except yaml.YAMLError as e:
             print(f"Error parsing config.yaml: {e}")
             return {}
+        
+        # 写入缓存失败（如目录只读、包含无法序列化为JSON的值）时不影响正常使用
+        try:
+            content = json.dumps({
+                'mtime_ns': config_stat.st_mtime_ns,
+                'size': config_stat.st_size,
+                'data': config_data
+            }, ensure_ascii=False)
+            # 经JSON转换后会改变的内容（如非字符串键）不缓存，保证从缓存读取的配置与YAML解析结果一致
+            if json.loads(content)['data'] == config_data:
+                self._write_cache(cache_path, content, config_stat.st_mode)
+        except (OSError, TypeError, ValueError):
+            pass
+        
+        return config_data
+    
+    @staticmethod
+    def _write_cache(cache_path: Path, content: str, mode: int):
+        """原子地写入配置缓存，缓存包含密钥等敏感信息，文件权限与config.yaml保持一致"""
+        # 先写入同目录下的临时文件再替换，多个进程同时启动时不会读到写了一半的缓存
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=f'.{cache_path.name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.chmod(tmp_path, mode & 0o777)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
     
     def get(self, key_path, default=None):
         """
         获取配置项
         key_path: 配置路径，支持点号分隔，如 'model.agent.name'
         """
-        keys = key_path.split('.')
-        value = self._config_data
-        
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        
-        return value
+        return self._flat.get(key_path, default)
     
     @property
     def model(self):
@@ -71,8 +133,14 @@ class Config:
         return self._config_data.get('project', {}).get('workspace', {}).get('path', '/tmp')
 
 
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """获取全局共享的配置实例，配置文件在进程内只加载一次"""
+    return Config()
+
+
 # 创建全局配置实例
-init_config = Config()
+init_config = get_config()
 
 # 导出常用配置项
 MODEL_AGENT_NAME = init_config.get('model.agent.name')
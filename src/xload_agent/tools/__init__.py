@@ -4,7 +4,7 @@ from .terminal.bash import bash_tool
 from .fs.grep import grep_tool
 from .fs.ls import ls_tool
 from .fs.tree import tree_tool
-from .fs.mcp import fs_tool_mcp
+from .fs.mcp import get_fs_tool_mcp
 
 __all__ = [
     "k6_tool",
@@ -12,5 +12,5 @@ __all__ = [
     "grep_tool",
     "ls_tool",
     "tree_tool",
-    "fs_tool_mcp",
+    "get_fs_tool_mcp",
 ]   
\ No newline at end of file
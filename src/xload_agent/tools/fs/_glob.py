@@ -0,0 +1,33 @@
+import re
+import fnmatch
+import functools
+from typing import FrozenSet, Iterable, Optional, Pattern, Tuple
+
+
+def compile_globs(patterns: Iterable[str]) -> Optional[Pattern]:
+    """将多个glob模式合并编译为一个正则表达式，匹配任意一个模式即视为匹配。
+
+    Args:
+        patterns: glob模式列表，语法与fnmatch相同。
+
+    Returns:
+        Pattern: 合并后的正则表达式；没有任何模式时返回None。
+    """
+    translated = [f"(?:{fnmatch.translate(pattern)})" for pattern in patterns]
+    if not translated:
+        return None
+    return re.compile("|".join(translated))
+
+
+@functools.lru_cache(maxsize=32)
+def ignore_regex(base: FrozenSet[str], extra: Tuple[str, ...]) -> Optional[Pattern]:
+    """合并默认忽略模式与自定义忽略模式并编译，编译结果在多次调用间复用。
+
+    Args:
+        base: 调用方模块的默认忽略模式。
+        extra: 排序后的自定义忽略模式，排序保证顺序不同的相同列表命中同一缓存。
+
+    Returns:
+        Pattern: 合并后的正则表达式；没有任何模式时返回None。
+    """
+    return compile_globs(base.union(extra))
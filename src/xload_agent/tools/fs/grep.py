@@ -1,42 +1,570 @@
+import io
+import os
+import asyncio
+import functools
 import re
-import fnmatch
+import mmap
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List, Dict, Pattern
+from typing import Optional, List, Dict, BinaryIO, Deque, Iterable, Iterator, Pattern, Set, Tuple
+
+from re import _constants as sre_constants
+from re import _parser as sre_parse
 
 from google.adk.tools.tool_context import ToolContext
 
-def grep_tool(
-    pattern: str,
-    path: str,
-    recursive: bool = True,
-    file_pattern: Optional[List[str]] = None,
-    ignore: Optional[List[str]] = None,
-    case_sensitive: bool = False,
-    max_results: int = 1000,
-    tool_context: ToolContext = None
+from ._glob import compile_globs, ignore_regex
+
+# 默认忽略模式
+DEFAULT_IGNORE_PATTERNS = [
+    "*.pyc", "__pycache__", ".git", ".svn", ".hg", ".DS_Store",
+    "*.tmp", "*.temp", "*.log", ".idea", "*.vscode", "node_modules"
+]
+
+_BASE_IGNORE = frozenset(DEFAULT_IGNORE_PATTERNS)
+
+# 探测二进制文件时读取的文件头大小
+BINARY_PROBE_SIZE = 8192
+
+# 搜索线程数量，与ThreadPoolExecutor的默认值一致
+MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# 同时提交给线程池的文件数量上限，避免一次性提交所有文件
+MAX_PENDING_FILES = MAX_WORKERS * 2
+
+# 预过滤使用的字面量最短字节数，过短的字面量命中太多，预过滤没有意义
+MIN_LITERAL_LENGTH = 3
+
+# 忽略大小写时，这些ASCII字母还会匹配非ASCII字符（如 ı、İ、ſ、K），不能按字节比较
+_CASE_FOLD_UNSAFE = frozenset("iksIKS")
+
+_REPEAT_OPS = (
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+    sre_constants.POSSESSIVE_REPEAT,
+)
+
+
+def _literal_char(code: int, ignore_case: bool) -> Optional[str]:
+    """返回可用于字节级预过滤的字面量字符，不可用时返回None。"""
+    char = chr(code)
+    if char == "\n":
+        return None
+    if ignore_case:
+        if char in _CASE_FOLD_UNSAFE:
+            return None
+        # 非ASCII字符只有在没有大小写之分时（如中文）才能按字节比较
+        if not char.isascii() and char.lower() != char.upper():
+            return None
+        return char.lower()
+    return char
+
+
+def _required_literals(items, ignore_case: bool) -> Optional[Set[str]]:
+    """从解析后的正则表达式中提取字面量集合，任何匹配都至少包含其中一个。"""
+    best: Optional[Set[str]] = None
+    
+    def consider(candidates: Optional[Set[str]]) -> None:
+        nonlocal best
+        if not candidates:
+            return
+        if best is None or min(map(len, candidates)) > min(map(len, best)):
+            best = candidates
+    
+    run: List[str] = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            char = _literal_char(av, ignore_case)
+            if char is not None:
+                run.append(char)
+                continue
+        
+        # 连续字面量在此中断
+        if run:
+            consider({"".join(run)})
+            run = []
+        
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            # 局部修改大小写规则的分组无法与整体的预过滤方式保持一致
+            if not (add_flags | del_flags) & re.IGNORECASE:
+                consider(_required_literals(sub, ignore_case))
+        elif op is sre_constants.BRANCH:
+            branches = [_required_literals(branch, ignore_case) for branch in av[1]]
+            if all(branches):
+                consider(set().union(*branches))
+        elif op in _REPEAT_OPS:
+            min_count, _, sub = av
+            if min_count >= 1:
+                consider(_required_literals(sub, ignore_case))
+    
+    if run:
+        consider({"".join(run)})
+    
+    return best
+
+
+class LiteralPrefilter:
+    """字面量预过滤器，在原始字节中快速定位可能匹配的位置。
+
+    单个区分大小写的字面量直接使用find查找；多个字面量（如 'foo|bar'）或忽略大小写时，
+    合并为一个字节正则扫描。两种方式都直接在mmap上查找，不复制文件内容。
+    只有命中字面量的行才会交给正则表达式匹配；
+    整个模式就是一个字面量时（exact为True），命中位置即为匹配位置，无需再执行正则匹配。
+    """
+    
+    def __init__(self, literals: Set[str], ignore_case: bool, exact: bool = False):
+        self.ignore_case = ignore_case
+        self.exact = exact
+        # 精确匹配时字面量的字符长度，用于计算匹配结束位置
+        self.match_length = len(next(iter(literals)))
+        self.needles = sorted(literal.encode('utf-8') for literal in literals)
+        self.needle_pattern = None
+        
+        if ignore_case or len(self.needles) > 1:
+            # 字节正则的IGNORECASE只折叠ASCII字母，字面量提取时已排除其他需要折叠大小写的字符
+            flags = re.IGNORECASE if ignore_case else 0
+            self.needle_pattern = re.compile(b"|".join(map(re.escape, self.needles)), flags)
+    
+    @classmethod
+    def from_pattern(cls, regex_pattern: Pattern) -> Optional["LiteralPrefilter"]:
+        """根据正则表达式构建预过滤器，无法提取足够长的字面量时返回None。"""
+        ignore_case = bool(regex_pattern.flags & re.IGNORECASE)
+        try:
+            parsed = sre_parse.parse(regex_pattern.pattern, regex_pattern.flags)
+        except Exception:
+            return None
+        
+        literals = _required_literals(parsed, ignore_case)
+        if not literals:
+            return None
+        
+        # 整个模式只由字面量组成时无需正则确认，字面量再短也值得直接查找
+        exact = all(
+            op is sre_constants.LITERAL and _literal_char(av, ignore_case) not in (None, "\r")
+            for op, av in parsed
+        )
+        if not exact and min(len(literal.encode('utf-8')) for literal in literals) < MIN_LITERAL_LENGTH:
+            return None
+        return cls(literals, ignore_case, exact)
+    
+    def positions(self, data) -> Iterator[int]:
+        """按从前到后的顺序返回字面量在data中的起始偏移，同一位置之后的重叠命中不再返回。"""
+        if self.needle_pattern is None:
+            needle = self.needles[0]
+            pos = data.find(needle)
+            while pos >= 0:
+                yield pos
+                pos = data.find(needle, pos + 1)
+        else:
+            for match in self.needle_pattern.finditer(data):
+                yield match.start()
+
+
+# 按字节匹配与按字符匹配结果一致的行首/行尾断言
+_BYTE_SAFE_AT = (sre_constants.AT_BEGINNING, sre_constants.AT_END)
+
+
+def _is_byte_safe(items, ignore_case: bool) -> bool:
+    """判断解析后的正则表达式按UTF-8字节匹配时，结果是否与按字符匹配完全一致。
+
+    只接受ASCII字面量、ASCII字符集、分组、分支、重复以及行首/行尾断言，
+    且不能匹配换行符，这样匹配范围必然落在单行之内。
+    """
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if _literal_char(av, ignore_case) is None or av >= 128:
+                return False
+        elif op is sre_constants.IN:
+            for item_op, item_av in av:
+                if item_op is sre_constants.LITERAL:
+                    codes = (item_av,)
+                elif item_op is sre_constants.RANGE and item_av[1] < 128:
+                    codes = range(item_av[0], item_av[1] + 1)
+                else:
+                    return False
+                if any(_literal_char(code, ignore_case) is None or code >= 128 for code in codes):
+                    return False
+        elif op is sre_constants.AT:
+            if av not in _BYTE_SAFE_AT:
+                return False
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            if add_flags or del_flags or not _is_byte_safe(sub, ignore_case):
+                return False
+        elif op is sre_constants.BRANCH:
+            if not all(_is_byte_safe(branch, ignore_case) for branch in av[1]):
+                return False
+        elif op in _REPEAT_OPS:
+            if not _is_byte_safe(av[2], ignore_case):
+                return False
+        elif op is not sre_constants.GROUPREF:
+            return False
+    return True
+
+
+def compile_byte_pattern(regex_pattern: Pattern) -> Optional[Pattern]:
+    """将正则表达式编译为等价的字节正则（多行模式），无法保证等价时返回None。"""
+    if not regex_pattern.pattern.isascii():
+        return None
+    
+    ignore_case = bool(regex_pattern.flags & re.IGNORECASE)
+    try:
+        parsed = sre_parse.parse(regex_pattern.pattern, regex_pattern.flags)
+        if not _is_byte_safe(parsed, ignore_case):
+            return None
+        flags = (regex_pattern.flags & ~re.UNICODE) | re.MULTILINE
+        return re.compile(regex_pattern.pattern.encode('ascii'), flags)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _build_matchers(regex_pattern: Pattern) -> Tuple[Optional[LiteralPrefilter], Optional[Pattern]]:
+    """为正则表达式构建预过滤器或等价的字节正则，相同的模式在多次调用间复用。
+
+    Returns:
+        tuple: (字面量预过滤器, 字节正则)，能提取字面量时只构建预过滤器，两者均可能为None。
+    """
+    prefilter = LiteralPrefilter.from_pattern(regex_pattern)
+    byte_pattern = None if prefilter is not None else compile_byte_pattern(regex_pattern)
+    return prefilter, byte_pattern
+
+
+def _build_match(
+    file_path: str,
+    line_num: int,
+    line_content: str,
+    match_start: int,
+    match_end: int
 ) -> Dict:
-    """在指定路径中搜索匹配正则表达式的文本行，类似系统的grep命令。
+    """构建单条匹配结果，匹配部分只记录偏移量，需要时由调用方从content中切片。"""
+    return {
+        "file": file_path,
+        "line": line_num,
+        "content": line_content,
+        "match_start": match_start,
+        "match_end": match_end
+    }
+
+
+def _search_file_prefiltered(
+    file_path: str,
+    data,
+    regex_pattern: Pattern,
+    max_per_file: int,
+    cancel: threading.Event,
+    prefilter: LiteralPrefilter
+) -> Optional[List[Dict]]:
+    """借助字面量预过滤搜索文件内容，只对命中字面量的行执行正则匹配，纯字面量模式直接采用命中位置。
+
+    内容包含回车符时返回None，由调用方回退到文本模式，以保持换行符转换后的分行语义。
+    """
+    file_matches = []
+    size = len(data)
+    
+    if data.find(b'\r') >= 0:
+        return None
+    
+    line_num = 1
+    counted = 0
+    next_line = 0
+    
+    for hit in prefilter.positions(data):
+        # 同一行内的其他命中无需重复处理
+        if hit < next_line:
+            continue
+        
+        # 检查是否超过最大结果限制或已被取消
+        if len(file_matches) >= max_per_file or cancel.is_set():
+            break
+        
+        # 定位命中所在的行并累计行号
+        line_start = data.rfind(b'\n', 0, hit) + 1
+        line_end = data.find(b'\n', hit)
+        if line_end < 0:
+            line_end = size
+        line_num += data[counted:line_start].count(b'\n')
+        counted = line_start
+        next_line = line_end + 1
+        
+        # 与文本模式逐行读取保持一致：保留换行符参与匹配
+        line_content = data[line_start:line_end].decode('utf-8', errors='ignore')
+        line = line_content + '\n' if line_end < size else line_content
+        
+        if prefilter.exact:
+            # 命中位置就是该行的第一个匹配，只需将字节偏移换算为字符偏移
+            match_start = len(data[line_start:hit].decode('utf-8', errors='ignore'))
+            match_end = match_start + prefilter.match_length
+            file_matches.append(_build_match(file_path, line_num, line_content, match_start, match_end))
+            continue
+        
+        match = regex_pattern.search(line)
+        if match:
+            file_matches.append(_build_match(file_path, line_num, line_content, *match.span()))
+    
+    return file_matches
+
+
+def _search_file_bytes(
+    file_path: str,
+    data,
+    max_per_file: int,
+    cancel: threading.Event,
+    byte_pattern: Pattern
+) -> Optional[List[Dict]]:
+    """直接以字节正则搜索文件内容，只解码匹配行。
+
+    内容包含回车符时返回None，由调用方回退到文本模式，以保持换行符转换后的匹配语义。
+    """
+    file_matches = []
+    size = len(data)
+    if size == 0:
+        return file_matches
+    
+    if data.find(b'\r') >= 0:
+        return None
+    
+    # 文件以换行结尾时，末尾之后不存在新的一行
+    ends_with_newline = data[size - 1] == ord('\n')
+    line_num = 1
+    counted = 0
+    pos = 0
+    
+    while pos <= size:
+        # 检查是否超过最大结果限制或已被取消
+        if len(file_matches) >= max_per_file or cancel.is_set():
+            break
+        
+        match = byte_pattern.search(data, pos)
+        if match is None:
+            break
+        
+        start = match.start()
+        if start == size and ends_with_newline:
+            break
+        
+        # 定位匹配所在的行并累计行号
+        line_start = data.rfind(b'\n', 0, start) + 1
+        line_end = data.find(b'\n', start)
+        if line_end < 0:
+            line_end = size
+        line_num += data[counted:line_start].count(b'\n')
+        counted = line_start
+        
+        # 只解码匹配行，匹配部分均为ASCII字符，长度不变
+        line_content = data[line_start:line_end].decode('utf-8', errors='ignore')
+        match_start = len(data[line_start:start].decode('utf-8', errors='ignore'))
+        match_end = match_start + match.end() - start
+        file_matches.append(_build_match(file_path, line_num, line_content, match_start, match_end))
+        
+        # 每行只记录第一个匹配
+        pos = line_end + 1
+    
+    return file_matches
+
+
+def _search_file_text(
+    file_path: str,
+    stream: BinaryIO,
+    regex_pattern: Pattern,
+    max_per_file: int,
+    cancel: threading.Event
+) -> List[Dict]:
+    """以文本方式逐行搜索文件内容。"""
+    file_matches = []
+    
+    text = io.TextIOWrapper(stream, encoding='utf-8', errors='ignore')
+    for line_num, line in enumerate(text, 1):
+        # 检查是否超过最大结果限制或已被取消
+        if len(file_matches) >= max_per_file or cancel.is_set():
+            break
+        
+        # 搜索匹配
+        match = regex_pattern.search(line)
+        if match:
+            # 提取匹配的行内容（去除末尾换行）
+            line_content = line.rstrip('\n\r')
+            file_matches.append(_build_match(file_path, line_num, line_content, *match.span()))
+    
+    # 交还底层文件对象，由调用方负责关闭
+    text.detach()
+    return file_matches
+
+
+def _search_file(
+    file_path: str,
+    regex_pattern: Pattern,
+    max_per_file: int,
+    cancel: threading.Event,
+    prefilter: Optional[LiteralPrefilter] = None,
+    byte_pattern: Optional[Pattern] = None
+) -> List[Dict]:
+    """搜索单个文件，返回该文件中的匹配结果列表。
+
+    文件开头包含空字节时视为二进制文件直接跳过，与grep --binary-files=without-match一致。
 
     Args:
-        pattern: 要搜索的正则表达式模式。
-        path: 要搜索的绝对路径（文件或目录）。
-        recursive: 是否递归搜索子目录，默认为True。
-        file_pattern: 可选的文件匹配模式数组，用于限制搜索的文件类型。
-        ignore: 可选的文件/目录忽略模式数组。
-        case_sensitive: 是否区分大小写，默认为False（不区分大小写）。
-        max_results: 最大返回结果数量，默认为1000。
-        tool_context: 工具上下文，由google-adk自动提供。
+        file_path: 要搜索的文件路径。
+        regex_pattern: 已编译的正则表达式。
+        max_per_file: 单个文件最多返回的匹配数量。
+        cancel: 取消标记，被设置时立即停止搜索。
+        prefilter: 可选的字面量预过滤器。
+        byte_pattern: 可选的等价字节正则，用于跳过逐行解码。
 
     Returns:
-        dict: 包含搜索结果的字典，格式为{"status": "success", "matches": [...], "stats": {...}}
-             或错误信息{"status": "error", "message": "错误描述"}
+        list: 匹配结果字典的列表。
     """
-    # 默认忽略模式
-    DEFAULT_IGNORE_PATTERNS = [
-        "*.pyc", "__pycache__", ".git", ".svn", ".hg", ".DS_Store",
-        "*.tmp", "*.temp", "*.log", ".idea", "*.vscode", "node_modules"
-    ]
+    file_matches = []
+    
+    if cancel.is_set():
+        return file_matches
     
+    try:
+        with open(file_path, 'rb') as f:
+            # 读取文件头探测二进制文件
+            head = f.read(BINARY_PROBE_SIZE)
+            if b'\x00' in head:
+                return file_matches
+            
+            # 小文件已经完整读入，直接复用；大文件通过mmap访问
+            if len(head) < BINARY_PROBE_SIZE:
+                data = head
+            else:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            
+            try:
+                if prefilter is not None:
+                    prefiltered_matches = _search_file_prefiltered(
+                        file_path, data, regex_pattern, max_per_file, cancel, prefilter
+                    )
+                    if prefiltered_matches is not None:
+                        return prefiltered_matches
+                
+                if byte_pattern is not None:
+                    byte_matches = _search_file_bytes(file_path, data, max_per_file, cancel, byte_pattern)
+                    if byte_matches is not None:
+                        return byte_matches
+                
+                # 回退到文本方式逐行搜索
+                if data is head:
+                    stream = io.BytesIO(head)
+                else:
+                    f.seek(0)
+                    stream = f
+                return _search_file_text(file_path, stream, regex_pattern, max_per_file, cancel)
+            finally:
+                if data is not head:
+                    data.close()
+    
+    except PermissionError:
+        # 忽略没有权限访问的文件
+        pass
+    except Exception:
+        # 忽略无法读取的文件
+        pass
+    
+    return file_matches
+
+
+def _iter_files(
+    top: str,
+    recursive: bool,
+    ignore_re: Pattern,
+    match_re: Optional[Pattern]
+) -> Iterator[str]:
+    """基于os.scandir遍历目录，按深度优先顺序产出需要搜索的文件路径。
+
+    递归搜索时跳过无法访问的目录，与Path.walk一致；非递归搜索时顶层目录的访问错误直接抛出。
+    """
+    stack = [top]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            if not recursive:
+                raise
+            continue
+        
+        subdirs = []
+        for entry in entries:
+            # 先按名称过滤，被忽略的条目无需再查询文件类型
+            if ignore_re.match(entry.name) is not None:
+                continue
+            
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        subdirs.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            
+            if match_re is None or match_re.match(entry.name) is not None:
+                yield entry.path
+        
+        # 逆序入栈，保证子目录按列出顺序遍历
+        stack.extend(reversed(subdirs))
+
+
+def _iter_matches(
+    file_paths: Iterable[str],
+    regex_pattern: Pattern,
+    max_per_file: int,
+    prefilter: Optional[LiteralPrefilter],
+    byte_pattern: Optional[Pattern],
+    stats: Dict
+) -> Iterator[Dict]:
+    """并行搜索文件，按文件顺序逐个产出匹配结果。
+
+    同时提交的文件数量有上限，调用方停止迭代时通知工作线程提前结束，尚未开始的文件不再读取。
+    """
+    cancel = threading.Event()
+    files = iter(file_paths)
+    pending: Deque[Future] = deque()
+    
+    def submit(file_path: str) -> None:
+        pending.append(executor.submit(
+            _search_file, file_path, regex_pattern, max_per_file, cancel, prefilter, byte_pattern
+        ))
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        try:
+            for file_path in islice(files, MAX_PENDING_FILES):
+                submit(file_path)
+            
+            while pending:
+                file_matches = pending.popleft().result()
+                # 每取走一个结果就补充一个文件，保持在途任务数量
+                for file_path in islice(files, 1):
+                    submit(file_path)
+                
+                stats["files_searched"] += 1
+                yield from file_matches
+        finally:
+            cancel.set()
+            for future in pending:
+                future.cancel()
+
+
+def _grep_sync(
+    pattern: str,
+    path: str,
+    recursive: bool = True,
+    file_pattern: Optional[List[str]] = None,
+    ignore: Optional[List[str]] = None,
+    case_sensitive: bool = False,
+    max_results: int = 1000
+) -> Dict:
+    """grep_tool的同步实现，参数与返回值同grep_tool。"""
     # 验证路径是否为绝对路径
     _path = Path(path)
     if not _path.is_absolute():
@@ -62,150 +590,74 @@ def grep_tool(
             "message": f"错误: 无效的正则表达式 '{pattern}': {str(e)}"
         }
     
-    # 合并忽略模式
-    ignore_patterns = (ignore or []) + DEFAULT_IGNORE_PATTERNS
-    
-    # 统计信息
-    stats = {
-        "files_searched": 0,
-        "files_matched": 0,
-        "lines_matched": 0,
-        "results_truncated": False
-    }
-    
-    # 匹配结果
-    matches = []
-    
-    # 检查文件是否应该被忽略
-    def should_ignore(path: Path) -> bool:
-        for pattern in ignore_patterns:
-            if fnmatch.fnmatch(path.name, pattern):
-                return True
-        return False
+    # 应用忽略模式
+    ignore_re = ignore_regex(_BASE_IGNORE, tuple(sorted(set(ignore or ()))))
+    match_re = compile_globs(file_pattern or [])
     
     # 检查文件是否应该被搜索
-    def should_search_file(path: Path) -> bool:
+    def should_search_file(name: str) -> bool:
         # 首先检查是否应该被忽略
-        if should_ignore(path):
+        if ignore_re.match(name) is not None:
             return False
         
         # 如果指定了文件模式，则检查是否匹配
-        if file_pattern:
-            for pattern in file_pattern:
-                if fnmatch.fnmatch(path.name, pattern):
-                    return True
-            return False
+        if match_re is not None:
+            return match_re.match(name) is not None
         
         # 默认搜索所有非忽略的文件
         return True
     
-    # 搜索单个文件
-    def search_file(file_path: Path) -> None:
-        nonlocal stats, matches
-        
-        stats["files_searched"] += 1
-        
-        # 检查是否超过最大结果限制
-        if len(matches) >= max_results:
-            stats["results_truncated"] = True
-            return
-        
-        try:
-            # 尝试以文本方式打开文件
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                file_matched = False
-                
-                for line_num, line in enumerate(f, 1):
-                    # 检查是否超过最大结果限制
-                    if len(matches) >= max_results:
-                        stats["results_truncated"] = True
-                        break
-                    
-                    # 搜索匹配
-                    match = regex_pattern.search(line)
-                    if match:
-                        if not file_matched:
-                            file_matched = True
-                            stats["files_matched"] += 1
-                        
-                        stats["lines_matched"] += 1
-                        
-                        # 提取匹配的行内容（去除末尾换行）
-                        line_content = line.rstrip('\n\r')
-                        
-                        # 计算上下文（前10个字符和后10个字符）
-                        match_start, match_end = match.span()
-                        context_start = max(0, match_start - 10)
-                        context_end = min(len(line_content), match_end + 10)
-                        
-                        # 构建匹配结果
-                        match_result = {
-                            "file": str(file_path),
-                            "line": line_num,
-                            "content": line_content,
-                            "match_start": match_start,
-                            "match_end": match_end,
-                            "context": {
-                                "prefix": line_content[context_start:match_start],
-                                "match": line_content[match_start:match_end],
-                                "suffix": line_content[match_end:context_end]
-                            }
-                        }
-                        
-                        matches.append(match_result)
-        
-        except PermissionError:
-            # 忽略没有权限访问的文件
-            pass
-        except Exception as e:
-            # 忽略无法读取的文件（例如二进制文件）
-            pass
+    # 单个文件需要先检查是否被忽略模式过滤
+    if _path.is_file() and not should_search_file(_path.name):
+        return {
+            "status": "error",
+            "message": f"错误: 文件 {path} 被忽略模式过滤。"
+        }
+    
+    # 统计信息
+    stats = {
+        "files_searched": 0,
+        "files_matched": 0,
+        "lines_matched": 0,
+        "results_truncated": False
+    }
+    
+    # 多取一个匹配用于判断结果是否被截断，单个文件的匹配数量也需要同样放宽
+    limit = max_results + 1
+    
+    # 尽可能提取字面量用于预过滤，否则尝试编译等价的字节正则
+    prefilter, byte_pattern = _build_matchers(regex_pattern)
     
-    # 开始搜索
+    # 待搜索的文件，递归搜索时边遍历边搜索
+    file_paths: Iterable[str]
+    top = str(_path)
     if _path.is_file():
         # 单个文件搜索
-        if should_search_file(_path):
-            search_file(_path)
-        else:
+        file_paths = [top]
+    elif recursive:
+        # 递归搜索
+        file_paths = _iter_files(top, True, ignore_re, match_re)
+    else:
+        # 非递归搜索
+        try:
+            file_paths = list(_iter_files(top, False, ignore_re, match_re))
+        except PermissionError:
             return {
                 "status": "error",
-                "message": f"错误: 文件 {path} 被忽略模式过滤。"
+                "message": f"错误: 没有权限访问路径 {path}。"
             }
-    else:
-        # 目录搜索
-        if recursive:
-            # 递归搜索
-            for root, dirs, files in _path.walk():
-                # 过滤目录
-                dirs[:] = [d for d in dirs if not should_ignore(Path(root) / d)]
-                
-                # 搜索文件
-                for file in files:
-                    file_path = Path(root) / file
-                    if should_search_file(file_path):
-                        search_file(file_path)
-                    
-                    # 检查是否超过最大结果限制
-                    if stats["results_truncated"]:
-                        break
-                
-                if stats["results_truncated"]:
-                    break
-        else:
-            # 非递归搜索
-            try:
-                for item in _path.iterdir():
-                    if item.is_file() and should_search_file(item):
-                        search_file(item)
-                    
-                    # 检查是否超过最大结果限制
-                    if stats["results_truncated"]:
-                        break
-            except PermissionError:
-                return {
-                    "status": "error",
-                    "message": f"错误: 没有权限访问路径 {path}。"
-                }
+    
+    # 并行搜索文件，结果按文件遍历顺序合并，取够结果后停止
+    with closing(_iter_matches(file_paths, regex_pattern, limit, prefilter, byte_pattern, stats)) as match_iter:
+        matches = list(islice(match_iter, limit))
+    
+    # 检查是否超过最大结果限制
+    if len(matches) > max_results:
+        matches.pop()
+        stats["results_truncated"] = True
+    
+    stats["lines_matched"] = len(matches)
+    stats["files_matched"] = len({match["file"] for match in matches})
     
     # 返回结果
     return {
@@ -218,6 +670,38 @@ def grep_tool(
         "stats": stats
     }
 
+async def grep_tool(
+    pattern: str,
+    path: str,
+    recursive: bool = True,
+    file_pattern: Optional[List[str]] = None,
+    ignore: Optional[List[str]] = None,
+    case_sensitive: bool = False,
+    max_results: int = 1000,
+    tool_context: ToolContext = None
+) -> Dict:
+    """在指定路径中搜索匹配正则表达式的文本行，类似系统的grep命令。
+
+    Args:
+        pattern: 要搜索的正则表达式模式。
+        path: 要搜索的绝对路径（文件或目录）。
+        recursive: 是否递归搜索子目录，默认为True。
+        file_pattern: 可选的文件匹配模式数组，用于限制搜索的文件类型。
+        ignore: 可选的文件/目录忽略模式数组。
+        case_sensitive: 是否区分大小写，默认为False（不区分大小写）。
+        max_results: 最大返回结果数量，默认为1000。
+        tool_context: 工具上下文，由google-adk自动提供。
+
+    Returns:
+        dict: 包含搜索结果的字典，格式为{"status": "success", "matches": [...], "stats": {...}}
+             或错误信息{"status": "error", "message": "错误描述"}
+    """
+    # 搜索在工作线程中执行，避免阻塞事件循环
+    return await asyncio.to_thread(
+        _grep_sync, pattern, path, recursive, file_pattern, ignore,
+        case_sensitive, max_results
+    )
+
 def grep_tool_formatted(
     pattern: str,
     path: str,
@@ -243,9 +727,9 @@ def grep_tool_formatted(
     Returns:
         str: 格式化的搜索结果或错误消息。
     """
-    result = grep_tool(
+    result = _grep_sync(
         pattern, path, recursive, file_pattern, ignore,
-        case_sensitive, max_results, tool_context
+        case_sensitive, max_results
     )
     
     if result["status"] == "error":
@@ -1,34 +1,26 @@
-import fnmatch
+import asyncio
 from pathlib import Path
 from typing import Optional
 
 from google.adk.tools.tool_context import ToolContext
 
+from ._glob import compile_globs, ignore_regex
 
-def ls_tool(
+# 默认忽略模式
+DEFAULT_IGNORE_PATTERNS = [
+    "*.pyc", "__pycache__", "*.swp", ".DS_Store", ".git", ".svn", ".hg",
+    "*.tmp", "*.temp", "*.log", ".idea", "*.vscode", "node_modules"
+]
+
+_BASE_IGNORE = frozenset(DEFAULT_IGNORE_PATTERNS)
+
+
+def _ls_sync(
     path: str,
     match: Optional[list[str]] = None,
-    ignore: Optional[list[str]] = None,
-    tool_context: ToolContext = None
+    ignore: Optional[list[str]] = None
 ) -> dict:
-    """列出给定路径中的文件和目录。可以选择性地提供glob模式来匹配和忽略。
-
-    Args:
-        path: 要列出文件和目录的绝对路径。不允许使用相对路径。
-        match: 可选的glob模式数组，用于匹配文件和目录。
-        ignore: 可选的glob模式数组，用于忽略文件和目录。
-        tool_context: 工具上下文，由google-adk自动提供。
-
-    Returns:
-        dict: 包含列出结果的字典，格式为{"status": "success", "items": [...]}
-             或错误信息{"status": "error", "message": "错误描述"}
-    """
-    # 默认忽略模式
-    DEFAULT_IGNORE_PATTERNS = [
-        "*.pyc", "__pycache__", "*.swp", ".DS_Store", ".git", ".svn", ".hg",
-        "*.tmp", "*.temp", "*.log", ".idea", "*.vscode", "node_modules"
-    ]
-    
+    """ls_tool的同步实现，参数与返回值同ls_tool。"""
     # 检查路径是否为绝对路径
     _path = Path(path)
     if not _path.is_absolute():
@@ -69,27 +61,13 @@ def ls_tool(
     items.sort(key=lambda x: (x.is_file(), x.name.lower()))
     
     # 应用匹配模式（如果提供）
-    if match:
-        filtered_items = []
-        for item in items:
-            for pattern in match:
-                if fnmatch.fnmatch(item.name, pattern):
-                    filtered_items.append(item)
-                    break
-        items = filtered_items
+    match_re = compile_globs(match or [])
+    if match_re is not None:
+        items = [item for item in items if match_re.match(item.name)]
     
     # 应用忽略模式
-    ignore = (ignore or []) + DEFAULT_IGNORE_PATTERNS
-    filtered_items = []
-    for item in items:
-        should_ignore = False
-        for pattern in ignore:
-            if fnmatch.fnmatch(item.name, pattern):
-                should_ignore = True
-                break
-        if not should_ignore:
-            filtered_items.append(item)
-    items = filtered_items
+    ignore_re = ignore_regex(_BASE_IGNORE, tuple(sorted(set(ignore or ()))))
+    items = [item for item in items if not ignore_re.match(item.name)]
     
     # 格式化输出项目
     result_items = []
@@ -107,6 +85,28 @@ def ls_tool(
     }
 
 
+async def ls_tool(
+    path: str,
+    match: Optional[list[str]] = None,
+    ignore: Optional[list[str]] = None,
+    tool_context: ToolContext = None
+) -> dict:
+    """列出给定路径中的文件和目录。可以选择性地提供glob模式来匹配和忽略。
+
+    Args:
+        path: 要列出文件和目录的绝对路径。不允许使用相对路径。
+        match: 可选的glob模式数组，用于匹配文件和目录。
+        ignore: 可选的glob模式数组，用于忽略文件和目录。
+        tool_context: 工具上下文，由google-adk自动提供。
+
+    Returns:
+        dict: 包含列出结果的字典，格式为{"status": "success", "items": [...]}
+             或错误信息{"status": "error", "message": "错误描述"}
+    """
+    # 目录访问在工作线程中执行，避免阻塞事件循环
+    return await asyncio.to_thread(_ls_sync, path, match, ignore)
+
+
 def ls_tool_formatted(
     path: str,
     match: Optional[list[str]] = None,
@@ -124,7 +124,7 @@ def ls_tool_formatted(
     Returns:
         str: 格式化的列表结果或错误消息。
     """
-    result = ls_tool(path, match, ignore, tool_context)
+    result = _ls_sync(path, match, ignore)
     
     if result["status"] == "error":
         return result["message"]
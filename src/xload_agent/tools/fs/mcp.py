@@ -1,16 +1,19 @@
+import functools
 import subprocess
 from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset,StdioServerParameters
 
 from veadk.utils.logger import get_logger
 
-from xload_agent.config import Config
+from xload_agent.config import get_config
 
-config = Config()
+config = get_config()
 WORKSPACE_PATH = config.workspace_path
 
 logger = get_logger(__name__)
 
+@functools.lru_cache(maxsize=1)
 def check_env():
+    """检查npx命令是否可用，每个进程只检查一次"""
     try:
         result = subprocess.run(
             ["npx", "-v"], capture_output=True, text=True, check=True
@@ -22,15 +25,18 @@ def check_env():
             "Check `npx` command failed. Please install `npx` command manually."
         ) from e
 
-check_env()
 
-fs_tool_mcp = MCPToolset(
-    connection_params=StdioServerParameters(
-        command="npx",
-        args=[
-            "-y",
-            "@modelcontextprotocol/server-filesystem",
-            WORKSPACE_PATH,
-        ],
-        env={}
-    ))
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def get_fs_tool_mcp() -> MCPToolset:
+    """获取文件系统MCP工具集，首次调用时才检查npx环境"""
+    check_env()
+    return MCPToolset(
+        connection_params=StdioServerParameters(
+            command="npx",
+            args=[
+                "-y",
+                "@modelcontextprotocol/server-filesystem",
+                WORKSPACE_PATH,
+            ],
+            env={}
+        ))
@@ -1,9 +1,60 @@
-import fnmatch
+import io
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Pattern, Tuple
 
 from google.adk.tools.tool_context import ToolContext
 
+from ._glob import compile_globs, ignore_regex
+
+from xload_agent.config import get_config
+
+config = get_config()
+
+# 树节点类型，所有节点共用同一组字符串
+_DIR = "directory"
+_FILE = "file"
+
+# 格式化输出时各类型节点的标记
+_MARKER = {_DIR: "[D] ", _FILE: "[F] "}
+
+# 是否并行读取目录，适用于NFS/SMB等目录读取延迟较高的网络文件系统，本地磁盘上没有收益
+PARALLEL_SCAN = bool(config.get('tools.tree.parallel_scan', False))
+
+# 并行读取目录时使用的线程数量
+SCAN_WORKERS = 8
+
+# 单次遍历最多返回的节点数量，超出后截断，避免超大目录占用过多内存和时间
+MAX_NODES = 50000
+
+# 默认忽略模式
+DEFAULT_IGNORE_PATTERNS = [
+    "*.pyc", "__pycache__", "*.swp", ".DS_Store", ".git", ".svn", ".hg",
+    "*.tmp", "*.temp", "*.log", ".idea", "*.vscode", "node_modules"
+]
+
+_BASE_IGNORE = frozenset(DEFAULT_IGNORE_PATTERNS)
+
+
+def _scan_directory(path: str, ignore_re: Pattern, match_re: Optional[Pattern]) -> List[os.DirEntry]:
+    """读取目录并返回过滤、排序后的条目，目录在前，文件在后，都按字母顺序排列。
+
+    先按名称过滤忽略的条目，被忽略的目录不会加入遍历队列，也就不会被读取；
+    匹配模式只用于过滤文件，目录始终保留，保证深层目录中匹配的文件也能列出。
+    DirEntry会缓存目录读取时返回的文件类型，排序键对每个条目只计算一次。
+    """
+    with os.scandir(path) as it:
+        entries = [
+            entry for entry in it
+            if not ignore_re.match(entry.name)
+            and (match_re is None or entry.is_dir() or match_re.match(entry.name))
+        ]
+    entries.sort(key=lambda x: (x.is_file(), x.name.lower()))
+    return entries
+
+
 def tree_tool(
     path: str,
     max_depth: int = 3,
@@ -11,12 +62,12 @@ def tree_tool(
     ignore: Optional[List[str]] = None,
     tool_context: ToolContext = None
 ) -> Dict:
-    """列出指定目录下的所有子孙目录和文件，支持指定最大深度（默认3层）。
+    """列出指定目录下的所有子孙目录和文件，支持指定最大深度（默认3层）。节点过多时结果会被截断。
 
     Args:
         path: 要列出文件和目录的绝对路径。不允许使用相对路径。
         max_depth: 最大遍历深度，默认为3层，最大不超过3层。
-        match: 可选的glob模式数组，用于匹配文件和目录。
+        match: 可选的glob模式数组，用于匹配文件，目录不受匹配模式限制。
         ignore: 可选的glob模式数组，用于忽略文件和目录。
         tool_context: 工具上下文，由google-adk自动提供。
 
@@ -24,12 +75,6 @@ def tree_tool(
         dict: 包含列出结果的字典，格式为{"status": "success", "tree": [...]} 
              或错误信息{"status": "error", "message": "错误描述"}
     """
-    # 默认忽略模式
-    DEFAULT_IGNORE_PATTERNS = [
-        "*.pyc", "__pycache__", "*.swp", ".DS_Store", ".git", ".svn", ".hg",
-        "*.tmp", "*.temp", "*.log", ".idea", "*.vscode", "node_modules"
-    ]
-    
     # 验证并限制最大深度
     max_depth = min(max(1, max_depth), 3)  # 确保深度在1到3之间
     
@@ -55,90 +100,94 @@ def tree_tool(
             "message": f"错误: 路径 {path} 不是目录。请提供有效的目录路径。"
         }
     
-    # 合并忽略模式
-    ignore_patterns = (ignore or []) + DEFAULT_IGNORE_PATTERNS
+    # 合并默认和自定义忽略模式，遍历前统一编译为正则表达式
+    ignore_re = ignore_regex(_BASE_IGNORE, tuple(sorted(set(ignore or ()))))
+    match_re = compile_globs(match or [])
     
-    # 递归遍历函数
-    def _walk_directory(current_path: Path, current_depth: int) -> List[Dict]:
-        items = []
+    # 广度优先遍历函数，子项直接追加到所属目录的children列表中，同时统计目录和文件数量
+    def _walk_directory(root_path: str, executor: Optional[ThreadPoolExecutor]) -> Tuple[List[Dict], int, int, bool]:
+        tree = []
+        dir_count = 0
+        file_count = 0
+        truncated = False
+        queue = deque([(root_path, tree, 1, None)])
         
-        try:
-            # 获取当前目录下的所有项目
-            directory_items = list(current_path.iterdir())
+        while queue:
+            current_path, items, current_depth, scan = queue.popleft()
             
-            # 排序项目: 目录在前，文件在后，都按字母顺序排列
-            directory_items.sort(key=lambda x: (x.is_file(), x.name.lower()))
-            
-            for item in directory_items:
-                # 检查是否需要忽略
-                should_ignore = False
-                for pattern in ignore_patterns:
-                    if fnmatch.fnmatch(item.name, pattern):
-                        should_ignore = True
-                        break
-                
-                if should_ignore:
-                    continue
-                
-                # 检查是否匹配模式（如果提供）
-                if match:
-                    matched = False
-                    for pattern in match:
-                        if fnmatch.fnmatch(item.name, pattern):
-                            matched = True
-                            break
-                    if not matched:
-                        continue
-                
-                item_info = {
-                    "name": item.name,
-                    "type": "directory" if item.is_dir() else "file",
-                    "path": str(item)
-                }
-                
-                # 如果是目录且未达到最大深度，递归遍历
-                if item.is_dir() and current_depth < max_depth:
-                    item_info["children"] = _walk_directory(item, current_depth + 1)
+            try:
+                # 并行模式下目录在入队时已提交读取，这里只需等待结果
+                if scan is not None:
+                    directory_items = scan.result()
+                else:
+                    directory_items = _scan_directory(current_path, ignore_re, match_re)
                 
-                items.append(item_info)
-        
-        except PermissionError:
-            # 没有权限访问的目录添加为特殊项目
-            items.append({
-                "name": current_path.name,
-                "type": "directory",
-                "path": str(current_path),
-                "error": "Permission denied"
-            })
-        except Exception as e:
-            # 其他异常处理
-            items.append({
-                "name": current_path.name,
-                "type": "directory",
-                "path": str(current_path),
-                "error": str(e)
-            })
-        
-        return items
-    
-    # 开始递归遍历
-    tree_structure = _walk_directory(_path, 1)
-    
-    # 计算统计信息
-    dir_count = 0
-    file_count = 0
-    
-    def _count_items(items):
-        nonlocal dir_count, file_count
-        for item in items:
-            if item["type"] == "directory":
+                for item in directory_items:
+                    # 节点数量达到上限时在当前位置添加截断标记，并停止整个遍历
+                    if dir_count + file_count >= MAX_NODES:
+                        items.append({
+                            "name": "...",
+                            "type": _DIR,
+                            "path": current_path,
+                            "error": "truncated"
+                        })
+                        truncated = True
+                        break
+                    
+                    is_dir = item.is_dir()
+                    item_info = {
+                        "name": item.name,
+                        "type": _DIR if is_dir else _FILE,
+                        "path": item.path
+                    }
+                    
+                    # 如果是目录且未达到最大深度，加入队列稍后遍历
+                    if is_dir and current_depth < max_depth:
+                        item_info["children"] = []
+                        if executor is not None:
+                            scan = executor.submit(_scan_directory, item.path, ignore_re, match_re)
+                        else:
+                            scan = None
+                        queue.append((item.path, item_info["children"], current_depth + 1, scan))
+                    
+                    items.append(item_info)
+                    if is_dir:
+                        dir_count += 1
+                    else:
+                        file_count += 1
+            
+            except PermissionError:
+                # 没有权限访问的目录添加为特殊项目，同样计为目录
                 dir_count += 1
-                if "children" in item:
-                    _count_items(item["children"])
-            else:
-                file_count += 1
+                items.append({
+                    "name": os.path.basename(current_path),
+                    "type": _DIR,
+                    "path": current_path,
+                    "error": "Permission denied"
+                })
+            except Exception as e:
+                # 其他异常处理
+                dir_count += 1
+                items.append({
+                    "name": os.path.basename(current_path),
+                    "type": _DIR,
+                    "path": current_path,
+                    "error": str(e)
+                })
+            
+            if truncated:
+                break
+        
+        return tree, dir_count, file_count, truncated
     
-    _count_items(tree_structure)
+    # 开始遍历，启用并行读取时使用线程池提前读取排队中的目录
+    executor = ThreadPoolExecutor(max_workers=SCAN_WORKERS) if PARALLEL_SCAN else None
+    try:
+        tree_structure, dir_count, file_count, truncated = _walk_directory(str(_path), executor)
+    finally:
+        if executor is not None:
+            # 遍历被截断时尚未开始的读取任务直接取消
+            executor.shutdown(cancel_futures=True)
     
     return {
         "status": "success",
@@ -147,7 +196,8 @@ def tree_tool(
         "tree": tree_structure,
         "directories": dir_count,
         "files": file_count,
-        "total": dir_count + file_count
+        "total": dir_count + file_count,
+        "truncated": truncated
     }
 
 def tree_tool_formatted(
@@ -162,7 +212,7 @@ def tree_tool_formatted(
     Args:
         path: 要列出文件和目录的绝对路径。不允许使用相对路径。
         max_depth: 最大遍历深度，默认为3层，最大不超过3层。
-        match: 可选的glob模式数组，用于匹配文件和目录。
+        match: 可选的glob模式数组，用于匹配文件，目录不受匹配模式限制。
         ignore: 可选的glob模式数组，用于忽略文件和目录。
         tool_context: 工具上下文，由google-adk自动提供。
 
@@ -174,10 +224,9 @@ def tree_tool_formatted(
     if result["status"] == "error":
         return result["message"]
     
-    # 生成格式化的树形输出
-    def _format_tree(items, level=0, prefix="") -> str:
-        output = []
-        
+    # 生成格式化的树形输出，每行直接写入缓冲区，不构造中间列表和拼接字符串
+    def _format_tree(buf: io.StringIO, items, level=0, prefix="") -> None:
+        last = len(items) - 1
         for i, item in enumerate(items):
             # 确定连接符号和前缀
             if level == 0:
@@ -185,7 +234,7 @@ def tree_tool_formatted(
                 connector = ""
                 new_prefix = "    "
             else:
-                if i == len(items) - 1:
+                if i == last:
                     # 最后一项
                     connector = "└── "
                     new_prefix = prefix + "    "
@@ -195,31 +244,34 @@ def tree_tool_formatted(
                     new_prefix = prefix + "│   "
             
             # 添加当前项
-            item_marker = "[D] " if item["type"] == "directory" else "[F] "
-            output_line = prefix + connector + item_marker + item["name"]
+            buf.write(prefix)
+            buf.write(connector)
+            buf.write(_MARKER[item["type"]])
+            buf.write(item["name"])
             
             # 如果有错误信息，添加错误标记
             if "error" in item:
-                output_line += f"  [ERROR: {item['error']}]"
+                buf.write(f"  [ERROR: {item['error']}]")
             
-            output.append(output_line)
+            buf.write("\n")
             
             # 递归格式化子项
             if "children" in item and item["children"]:
-                output.extend(_format_tree(item["children"], level + 1, new_prefix))
-        
-        return output
+                _format_tree(buf, item["children"], level + 1, new_prefix)
     
     # 开始格式化
-    formatted_lines = [f"目录树: {path} (最大深度: {result['max_depth']})"]
-    formatted_lines.extend(_format_tree(result["tree"]))
-    formatted_lines.append("")
-    formatted_lines.append(f"统计信息:")
-    formatted_lines.append(f"  目录数: {result['directories']}")
-    formatted_lines.append(f"  文件数: {result['files']}")
-    formatted_lines.append(f"  总计: {result['total']}")
+    buf = io.StringIO()
+    buf.write(f"目录树: {path} (最大深度: {result['max_depth']})\n")
+    _format_tree(buf, result["tree"])
+    buf.write("\n")
+    buf.write("统计信息:\n")
+    buf.write(f"  目录数: {result['directories']}\n")
+    buf.write(f"  文件数: {result['files']}\n")
+    buf.write(f"  总计: {result['total']}")
+    if result["truncated"]:
+        buf.write(f"\n注意: 节点数量超过{MAX_NODES}个，结果已截断")
     
-    return "\n".join(formatted_lines)
+    return buf.getvalue()
 
 if __name__ == "__main__":
     # 示例用法
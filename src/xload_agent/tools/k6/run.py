@@ -1,15 +1,139 @@
 import os
+import stat
+import functools
 import subprocess
 import json
+import random
 import tempfile
-from typing import Dict, Any, Optional
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+
+# 返回结果中保留的k6标准输出末尾行数，足以容纳k6结束时打印的汇总信息
+STDOUT_TAIL_LINES = 64
+
+# 趋势类指标计算百分位时最多保留的样本数，超出后使用蓄水池抽样
+TREND_RESERVOIR_SIZE = 10000
+
+# 汇总导出时k6计算的趋势指标统计项，默认只到p(95)，这里与逐点统计的字段保持一致
+SUMMARY_TREND_STATS = "avg,min,med,max,p(90),p(95),p(99)"
+
+
+def _percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """计算已排序样本的百分位数，相邻样本之间线性插值"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class _MetricAccumulator:
+    """按k6指标类型流式累计数据点，汇总字段与k6的--summary-export保持一致"""
+    
+    def __init__(self, metric_type: str):
+        self.metric_type = metric_type
+        self.count = 0
+        self.total = 0
+        self.passes = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.last: Optional[float] = None
+        self.samples: List[float] = []
+    
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value:
+            self.passes += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        
+        # 只为趋势类指标保留样本，样本数量固定，内存占用不随测试时长增长
+        if self.metric_type == "trend":
+            if len(self.samples) < TREND_RESERVOIR_SIZE:
+                self.samples.append(value)
+            else:
+                index = random.randrange(self.count)
+                if index < TREND_RESERVOIR_SIZE:
+                    self.samples[index] = value
+    
+    def summary(self, duration: float) -> Dict[str, Any]:
+        if self.metric_type == "counter":
+            return {"count": self.total, "rate": self.total / duration if duration > 0 else 0.0}
+        if self.metric_type == "rate":
+            return {"passes": self.passes, "fails": self.count - self.passes, "value": self.passes / self.count}
+        if self.metric_type == "gauge":
+            return {"value": self.last, "min": self.min, "max": self.max}
+        
+        samples = sorted(self.samples)
+        return {
+            "avg": self.total / self.count,
+            "min": self.min,
+            "med": _percentile(samples, 50),
+            "max": self.max,
+            "p(90)": _percentile(samples, 90),
+            "p(95)": _percentile(samples, 95),
+            "p(99)": _percentile(samples, 99)
+        }
+
+
+def _read_json_metrics(file_path: str) -> Dict[str, Dict[str, Any]]:
+    """逐行读取k6的NDJSON输出并流式汇总各项指标，内存占用与输出文件大小无关"""
+    metric_types: Dict[str, str] = {}
+    accumulators: Dict[str, _MetricAccumulator] = {}
+    first_time = last_time = None
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            
+            metric = entry.get("metric")
+            data = entry.get("data") or {}
+            if entry.get("type") == "Metric":
+                # 指标定义总是先于该指标的数据点输出
+                metric_types[metric] = data.get("type", "trend")
+            elif entry.get("type") == "Point" and isinstance(data.get("value"), (int, float)):
+                accumulator = accumulators.get(metric)
+                if accumulator is None:
+                    accumulator = accumulators[metric] = _MetricAccumulator(metric_types.get(metric, "trend"))
+                accumulator.add(data["value"])
+                
+                last_time = data.get("time", last_time)
+                if first_time is None:
+                    first_time = last_time
+    
+    # 以首尾数据点的时间差作为测试时长，用于计算计数类指标的速率
+    duration = 0.0
+    if first_time and last_time:
+        try:
+            duration = (datetime.fromisoformat(last_time) - datetime.fromisoformat(first_time)).total_seconds()
+        except ValueError:
+            pass
+    
+    return {name: accumulator.summary(duration) for name, accumulator in accumulators.items()}
+
+
+@functools.lru_cache(maxsize=1)
+def _check_k6() -> None:
+    """检查k6是否已安装，检查通过后每个进程只执行一次；未通过时抛出异常，下次调用会重新检查"""
+    subprocess.run(["k6", "--version"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 
 def k6_tool(
     script_path: str,
     options: Optional[Dict[str, Any]] = None,
     env_vars: Optional[Dict[str, str]] = None,
-    format: str = "json"
+    format: str = "json",
+    raw: bool = False
 ) -> Dict[str, Any]:
     """
     执行k6脚本，支持性能测试和负载测试
@@ -19,6 +143,7 @@ def k6_tool(
         options: k6执行选项，如vus、duration、iterations等
         env_vars: 环境变量字典
         format: 输出格式，支持json、csv
+        raw: 是否基于逐个数据点的完整输出统计，默认为False，使用k6汇总导出的统计信息
         
     Returns:
         Dict: 包含执行结果的字典
@@ -36,8 +161,12 @@ def k6_tool(
             "stats": None
         }
     
-    # 验证脚本文件是否存在
-    if not os.path.isfile(script_path):
+    # 验证脚本文件是否存在，只调用一次stat，同时判断是否为普通文件
+    try:
+        is_file = stat.S_ISREG(os.stat(script_path).st_mode)
+    except (OSError, ValueError):
+        is_file = False
+    if not is_file:
         return {
             "success": False,
             "data": None,
@@ -46,7 +175,7 @@ def k6_tool(
         }
     
     # 验证文件扩展名是否为.js或.ts
-    if not (script_path.endswith('.js') or script_path.endswith('.ts')):
+    if not script_path.endswith(('.js', '.ts')):
         return {
             "success": False,
             "data": None,
@@ -56,7 +185,7 @@ def k6_tool(
     
     # 检查k6是否安装
     try:
-        subprocess.run(["k6", "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        _check_k6()
     except (subprocess.SubprocessError, FileNotFoundError):
         return {
             "success": False,
@@ -80,63 +209,83 @@ def k6_tool(
         process_env.update(env_vars)
     
     try:
-        # 创建临时文件存储输出
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.json') as temp_file:
-            temp_file_path = temp_file.name
+        # 设置输出格式和输出文件，默认只导出汇总结果，避免写出每个数据点
+        use_summary = format == "json" and not raw
         
-        # 设置输出格式和输出文件
-        if format == "json":
-            cmd.extend(["--out", f"json={temp_file_path}"])
-        elif format == "csv":
-            cmd.extend(["--out", f"csv={temp_file_path}"])
+        # 只有需要输出文件时才创建临时文件
+        temp_file_path = None
+        if format in ("json", "csv"):
+            with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{format}') as temp_file:
+                temp_file_path = temp_file.name
+        
+        if use_summary:
+            cmd.extend(["--summary-export", temp_file_path, "--summary-trend-stats", SUMMARY_TREND_STATS])
+        elif temp_file_path is not None:
+            cmd.extend(["--out", f"{format}={temp_file_path}"])
         
         # 添加脚本路径
         cmd.append(script_path)
         
-        # 执行k6命令
-        result = subprocess.run(
-            cmd,
-            env=process_env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        # 执行k6命令，标准输出只保留末尾若干行；标准错误写入临时文件，只在执行失败时读取
+        stderr_output = None
+        with tempfile.TemporaryFile() as stderr_file:
+            with subprocess.Popen(
+                cmd,
+                env=process_env,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True,
+                bufsize=1
+            ) as process:
+                stdout_tail = deque(process.stdout, maxlen=STDOUT_TAIL_LINES)
+                returncode = process.wait()
+            
+            if returncode != 0:
+                stderr_file.seek(0)
+                stderr_output = stderr_file.read().decode('utf-8', errors='replace')
         
         # 读取结果
         output = {}
         stats = None
         
-        try:
-            if os.path.exists(temp_file_path):
-                with open(temp_file_path, 'r', encoding='utf-8') as f:
-                    if format == "json":
+        if temp_file_path is not None:
+            try:
+                if use_summary:
+                    # 汇总结果是单个JSON文档，k6执行失败时可能为空
+                    with open(temp_file_path, 'r', encoding='utf-8') as f:
                         try:
                             output = json.load(f)
                         except json.JSONDecodeError:
-                            output = {"raw_output": f.read()}
-                    else:
+                            output = {}
+                elif format == "json":
+                    # k6的json输出是逐行的数据点（NDJSON），流式汇总为各指标的统计信息
+                    output = {"metrics": _read_json_metrics(temp_file_path)}
+                else:
+                    with open(temp_file_path, 'r', encoding='utf-8') as f:
                         output = {"raw_output": f.read()}
-        finally:
-            # 清理临时文件
-            if os.path.exists(temp_file_path):
+            except FileNotFoundError:
+                # 结果文件不存在时直接打开失败，无需事先检查
+                pass
+            finally:
+                # 清理临时文件
                 try:
                     os.unlink(temp_file_path)
-                except:
+                except OSError:
                     pass
         
         # 提取统计信息
-        if format == "json" and isinstance(output, dict):
-            stats = output.get('stats', {})
+        if format == "json":
+            stats = output.get('metrics', {})
         
         # 检查是否成功执行
-        success = result.returncode == 0
+        success = returncode == 0
         
         return {
             "success": success,
             "data": output,
-            "error": result.stderr if not success else None,
+            "error": stderr_output if not success else None,
             "stats": stats,
-            "stdout": result.stdout
+            "stdout": "".join(stdout_tail)
         }
         
     except Exception as e:
@@ -148,11 +297,19 @@ def k6_tool(
         }
 
 
+def _format_number(value: Optional[float], unit: str = "") -> str:
+    """格式化统计数值，缺失的指标显示为N/A"""
+    if value is None:
+        return "N/A"
+    return f"{value:.2f}{unit}"
+
+
 def k6_tool_formatted(
     script_path: str,
     options: Optional[Dict[str, Any]] = None,
     env_vars: Optional[Dict[str, str]] = None,
-    format: str = "json"
+    format: str = "json",
+    raw: bool = False
 ) -> str:
     """
     执行k6脚本并返回格式化的输出结果
@@ -162,11 +319,12 @@ def k6_tool_formatted(
         options: k6执行选项
         env_vars: 环境变量字典
         format: 输出格式
+        raw: 是否基于逐个数据点的完整输出统计
         
     Returns:
         str: 格式化的输出字符串
     """
-    result = k6_tool(script_path, options, env_vars, format)
+    result = k6_tool(script_path, options, env_vars, format, raw)
     
     if not result["success"]:
         return f"错误: {result['error']}"
@@ -183,24 +341,26 @@ def k6_tool_formatted(
     # 添加统计信息
     if result["stats"]:
         output_lines.append("\n性能统计:")
-        # 提取主要指标
-        http_reqs = result["stats"].get("http_req", {})
-        if http_reqs:
+        # 提取主要指标，指标名称与k6汇总结果一致
+        http_reqs = result["stats"].get("http_reqs", {})
+        http_req_duration = result["stats"].get("http_req_duration", {})
+        if http_reqs or http_req_duration:
             output_lines.append("\nHTTP请求:")
             output_lines.append(f"  - 总数: {http_reqs.get('count', 'N/A')}")
-            output_lines.append(f"  - RPS: {http_reqs.get('rate', 'N/A'):.2f}")
-            output_lines.append(f"  - 最小响应时间: {http_reqs.get('min', 'N/A'):.2f}ms")
-            output_lines.append(f"  - 最大响应时间: {http_reqs.get('max', 'N/A'):.2f}ms")
-            output_lines.append(f"  - 平均响应时间: {http_reqs.get('avg', 'N/A'):.2f}ms")
-            output_lines.append(f"  - 中位数响应时间: {http_reqs.get('med', 'N/A'):.2f}ms")
-            output_lines.append(f"  - 95th百分位: {http_reqs.get('p(95)', 'N/A'):.2f}ms")
-            output_lines.append(f"  - 99th百分位: {http_reqs.get('p(99)', 'N/A'):.2f}ms")
+            output_lines.append(f"  - RPS: {_format_number(http_reqs.get('rate'))}")
+            output_lines.append(f"  - 最小响应时间: {_format_number(http_req_duration.get('min'), 'ms')}")
+            output_lines.append(f"  - 最大响应时间: {_format_number(http_req_duration.get('max'), 'ms')}")
+            output_lines.append(f"  - 平均响应时间: {_format_number(http_req_duration.get('avg'), 'ms')}")
+            output_lines.append(f"  - 中位数响应时间: {_format_number(http_req_duration.get('med'), 'ms')}")
+            output_lines.append(f"  - 95th百分位: {_format_number(http_req_duration.get('p(95)'), 'ms')}")
+            output_lines.append(f"  - 99th百分位: {_format_number(http_req_duration.get('p(99)'), 'ms')}")
         
         # 检查错误率
-        checks = result["stats"].get("check", {})
+        checks = result["stats"].get("checks", {})
         if checks:
             output_lines.append("\n检查结果:")
-            output_lines.append(f"  - 通过率: {checks.get('rate', 'N/A') * 100:.2f}%")
+            rate = checks.get('value')
+            output_lines.append(f"  - 通过率: {_format_number(rate * 100 if rate is not None else None, '%')}")
         
         # 提取vus信息
         vus = result["stats"].get("vus", {})
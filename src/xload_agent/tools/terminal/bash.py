@@ -1,14 +1,58 @@
+import threading
+from collections import OrderedDict
 from typing import Optional, Dict
 
 from google.adk.tools.tool_context import ToolContext
 
 from .bash_terminal import BashTerminal
 
-from xload_agent.config import Config
+from xload_agent.config import get_config
 
-config = Config()
+config = get_config()
+WORKSPACE_PATH = config.workspace_path
 
-keep_alive_terminal: BashTerminal | None = None
+# 每个会话各自保持一个活动状态的终端，超出上限时关闭最久未使用的终端
+MAX_TERMINALS = 16
+_terminals: "OrderedDict[str, BashTerminal]" = OrderedDict()
+_terminals_lock = threading.Lock()
+
+
+def _get_terminal(session_id: str, workspace: Optional[str], reset: bool) -> BashTerminal:
+    """获取会话对应的终端，不存在或需要重置时创建新的终端
+
+    全局锁只保护字典的查找和写入，启动和关闭shell都在锁外进行，
+    避免一个会话的shell启动阻塞其他会话。
+    """
+    with _terminals_lock:
+        terminal = _terminals.get(session_id)
+        if terminal is not None and not reset:
+            _terminals.move_to_end(session_id)
+            return terminal
+    
+    new_terminal = BashTerminal(workspace)
+    stale_terminals = []
+    
+    with _terminals_lock:
+        current = _terminals.get(session_id)
+        if current is not None and current is not terminal:
+            # 创建期间同一会话的其他调用已放入新的终端，沿用该终端
+            stale_terminals.append(new_terminal)
+            new_terminal = current
+        else:
+            # 需要重置的旧终端被替换后关闭
+            if current is not None:
+                stale_terminals.append(current)
+            _terminals[session_id] = new_terminal
+            
+            while len(_terminals) > MAX_TERMINALS:
+                _, stale_terminal = _terminals.popitem(last=False)
+                stale_terminals.append(stale_terminal)
+        _terminals.move_to_end(session_id)
+    
+    for stale_terminal in stale_terminals:
+        stale_terminal.close()
+    
+    return new_terminal
 
 
 def bash_tool(
@@ -39,24 +83,16 @@ def bash_tool(
         dict: 包含执行结果的字典，格式为{"status": "success", "output": "输出内容"} 
              或错误信息{"status": "error", "message": "错误描述"}
     """
-    global keep_alive_terminal
-    
-    # 获取项目根目录（如果tool_context可用）
-    project_workspace = None
-    if tool_context:
-        # 从当前文件路径动态计算项目根目录
-        project_workspace = config.workspace_path
+    # 获取项目根目录和会话ID（如果tool_context可用）
+    project_workspace = WORKSPACE_PATH if tool_context else None
+    session_id = tool_context.session.id if tool_context else "default"
     
     try:
-        # 初始化或重置终端
-        if keep_alive_terminal is None:
-            keep_alive_terminal = BashTerminal(project_workspace)
-        elif reset_cwd:
-            keep_alive_terminal.close()
-            keep_alive_terminal = BashTerminal(project_workspace)
+        # 获取当前会话的终端，必要时初始化或重置
+        terminal = _get_terminal(session_id, project_workspace, reset_cwd)
         
         # 执行命令
-        output = keep_alive_terminal.execute(command)
+        output = terminal.execute(command)
         
         return {
             "status": "success",
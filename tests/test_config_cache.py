@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from xload_agent.config import Config
+
+
+class ConfigCacheTest(unittest.TestCase):
+    """config.yaml.json缓存必须与config.yaml的解析结果一致，配置文件变化后立即失效。"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config_path = Path(self.tmp.name) / "config.yaml"
+        self.cache_path = Path(self.tmp.name) / "config.yaml.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_config(self, text, mtime_ns=None):
+        self.config_path.write_text(text, encoding="utf-8")
+        if mtime_ns is not None:
+            os.utime(self.config_path, ns=(mtime_ns, mtime_ns))
+
+    def test_cached_load_matches_first_load(self):
+        self._write_config("project:\n  workspace:\n    path: /tmp/a\n")
+        self.assertEqual(Config(self.config_path).workspace_path, "/tmp/a")
+        self.assertTrue(self.cache_path.exists())
+        self.assertEqual(Config(self.config_path).workspace_path, "/tmp/a")
+
+    def test_edit_invalidates_cache(self):
+        self._write_config("project:\n  workspace:\n    path: /tmp/a\n")
+        Config(self.config_path)
+        self._write_config("project:\n  workspace:\n    path: /tmp/bb\n")
+        self.assertEqual(Config(self.config_path).workspace_path, "/tmp/bb")
+
+    def test_older_mtime_invalidates_cache(self):
+        # 用cp -p、rsync等方式替换为修改时间更早的配置文件时同样不能使用旧缓存
+        self._write_config("project:\n  workspace:\n    path: /tmp/a\n", mtime_ns=2_000_000_000_000_000_000)
+        Config(self.config_path)
+        self._write_config("project:\n  workspace:\n    path: /tmp/b\n", mtime_ns=1_000_000_000_000_000_000)
+        self.assertEqual(Config(self.config_path).workspace_path, "/tmp/b")
+
+    def test_values_changed_by_json_are_not_cached(self):
+        self._write_config("ports:\n  1: x\n")
+        self.assertEqual(Config(self.config_path).get("ports"), {1: "x"})
+        self.assertFalse(self.cache_path.exists())
+        self.assertEqual(Config(self.config_path).get("ports"), {1: "x"})
+
+    def test_cache_keeps_config_permissions(self):
+        self._write_config("logging:\n  level: INFO\n")
+        os.chmod(self.config_path, 0o600)
+        Config(self.config_path)
+        self.assertEqual(self.cache_path.stat().st_mode & 0o777, 0o600)
+
+
+if __name__ == "__main__":
+    unittest.main()
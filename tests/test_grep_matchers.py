@@ -0,0 +1,104 @@
+import re
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from xload_agent.tools.fs import grep
+from xload_agent.tools.fs.grep import LiteralPrefilter, compile_byte_pattern
+
+
+# 覆盖各种换行符、大小写、非ASCII字符以及超过探测大小（走mmap）的文件内容
+SAMPLES = {
+    "plain.py": b"import os\nimport re\n\ndef grep_tool(path):\n    return Tool(path)\n",
+    "crlf.txt": b"abc\r\ndef tool\r\nTOOL config\r\n",
+    "cr.txt": b"one tool\rtwo tool\rthree\n",
+    "chinese.md": "工具上下文\n返回结果: 工具\nArgs: 参数\n".encode("utf-8"),
+    "no_newline.txt": b"a\n\nxyz(1) tool",
+    "case.txt": b"CoNfIg.get('x')\nconfig.GET\nfoo\nbar foo\n",
+    "large.txt": b"".join(
+        b"line %d grep tree status error\n" % i if i % 7 == 0 else b"filler %d abcdef\n" % i
+        for i in range(2000)
+    ),
+}
+
+PATTERNS = [
+    "tool", "Tool", "def ", "工具", "工具上下文", "grep|tree", "import (os|re)",
+    "status.*error", "config\\.get", "foo\\n", "ret+urn", "a{2}bc", "errors?",
+    "^from", "\\)$", "c$", "[0-9]+", "(ab|cd)e?", "^$", "[a-f]+[0-9]", "\\bdef",
+]
+
+
+class GrepMatchersTest(unittest.TestCase):
+    """预过滤和字节正则的搜索结果必须与逐行文本搜索完全一致。"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.files = []
+        for name, content in SAMPLES.items():
+            file_path = Path(cls.tmp.name) / name
+            file_path.write_bytes(content)
+            cls.files.append(str(file_path))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _search(self, file_path, regex_pattern, prefilter=None, byte_pattern=None):
+        return grep._search_file(file_path, regex_pattern, 10**6, threading.Event(), prefilter, byte_pattern)
+
+    def test_prefilter_matches_text_scan(self):
+        for pattern in PATTERNS:
+            for flags in (0, re.IGNORECASE):
+                regex_pattern = re.compile(pattern, flags)
+                prefilter = LiteralPrefilter.from_pattern(regex_pattern)
+                if prefilter is None:
+                    continue
+                for file_path in self.files:
+                    with self.subTest(pattern=pattern, flags=flags, file=Path(file_path).name):
+                        self.assertEqual(
+                            self._search(file_path, regex_pattern, prefilter=prefilter),
+                            self._search(file_path, regex_pattern)
+                        )
+
+    def test_byte_pattern_matches_text_scan(self):
+        for pattern in PATTERNS:
+            for flags in (0, re.IGNORECASE):
+                regex_pattern = re.compile(pattern, flags)
+                byte_pattern = compile_byte_pattern(regex_pattern)
+                if byte_pattern is None:
+                    continue
+                for file_path in self.files:
+                    with self.subTest(pattern=pattern, flags=flags, file=Path(file_path).name):
+                        self.assertEqual(
+                            self._search(file_path, regex_pattern, byte_pattern=byte_pattern),
+                            self._search(file_path, regex_pattern)
+                        )
+
+    def test_lone_carriage_return_splits_lines(self):
+        regex_pattern = re.compile("two", re.IGNORECASE)
+        file_path = str(Path(self.tmp.name) / "cr.txt")
+        matches = self._search(file_path, regex_pattern, prefilter=LiteralPrefilter.from_pattern(regex_pattern))
+        self.assertEqual([(m["line"], m["content"]) for m in matches], [(2, "two tool")])
+
+    def test_literal_extraction(self):
+        prefilter = LiteralPrefilter.from_pattern(re.compile("grep|tree"))
+        self.assertEqual(prefilter.needles, [b"grep", b"tree"])
+        self.assertFalse(prefilter.exact)
+
+        prefilter = LiteralPrefilter.from_pattern(re.compile("k6"))
+        self.assertTrue(prefilter.exact)
+
+        # 过短的字面量和忽略大小写时会匹配非ASCII字符的字母不用于预过滤
+        self.assertIsNone(LiteralPrefilter.from_pattern(re.compile("a.b")))
+        self.assertIsNone(LiteralPrefilter.from_pattern(re.compile("kss", re.IGNORECASE)))
+
+    def test_byte_pattern_rejects_unicode_semantics(self):
+        self.assertIsNone(compile_byte_pattern(re.compile("\\w+")))
+        self.assertIsNone(compile_byte_pattern(re.compile("中")))
+        self.assertIsNotNone(compile_byte_pattern(re.compile("[a-f]+[0-9]")))
+
+
+if __name__ == "__main__":
+    unittest.main()